@@ -61,30 +61,117 @@ fi
 bindex="util/lib/bindex.jar"
 repoindex="util/lib/org.osgi.impl.bundle.repoindex.cli-2.1.4.jar"
 
-# Generate the actual index files...
-for dir in ${dirs[@]}; do
+# The JAR-files a directory was last indexed with are recorded in its stamp
+# file as a listing of their sha's, so adding, removing or changing the
+# content of any JAR-file changes it, whatever its mtime; remove the stamp
+# to force a directory to be indexed again.
+stampname=".genindex.stamp"
+
+# Succeeds if all index files of dir exist and the sha listing of its
+# JAR-files is the one recorded in the stamp.
+is_up_to_date() {
+    local dir=$1 jars=$2 stamp=$1/$stampname
+    [[ -f $stamp ]] || return 1
+    if [[ -f $repoindex ]]; then
+      for out in index.xml.gz index.xml index.xml.gz.sha index.xml.sha; do
+        [[ -f $dir/$out ]] || return 1
+      done
+    fi
+    if [[ -f $bindex && ! -f $dir/repository.xml ]]; then
+      return 1
+    fi
+    [[ "$jars" == "`cat $stamp`" ]]
+}
+
+# Generates the index files of a single directory, fails if any of the
+# indexers failed.
+index_dir() {
+    local dir=$1 jars files ran failed
     echo "Processing $dir ..."
 
-    # find all JAR-files except for those ending with -sources.jar!
-    files=`find $dir -name '*.jar' ! -name '*-sources.jar' -print`
+    # calculate the sha of all JAR-files, skip the directory if none of them
+    # changed
+    jars=`find $dir -name '*.jar' ! -type d -exec sha256sum {} + | LC_ALL=C sort -k 2`
+    if is_up_to_date $dir "$jars"; then
+      echo "Skipping $dir, index is up to date"
+      return 0
+    fi
+    # written before indexing so JAR-files changed during the run no longer
+    # match the stamp and are picked up next time
+    rm -f $dir/$stampname
+    echo "$jars" > $dir/$stampname.tmp
+    ran=0
+    failed=0
+
+    # all JAR-files except for those ending with -sources.jar!
+    files=`echo "$jars" | sed -e 's/^[0-9a-f]*  //' | grep -v -e '-sources\.jar$'`
     
     if [[ -f $repoindex ]]; then
-      echo "Running $repoindex ..."
+      echo "Running $repoindex for $dir ..."
+      ran=1
       # Generate index.xml.gz for dir
-      $java -jar $repoindex $dir -d $dir -r $dir/index.xml.gz
-      # Extract index.xml.gz to index.xml
-      #gzcat $dir/index.xml.gz > $dir/index.xml
-      gunzip  -c $dir/index.xml.gz > $dir/index.xml
-      # Calculate sha's for index.xml.gz and index.xml
-      sha256sum $dir/index.xml.gz | cut -f 1 -d " " > $dir/index.xml.gz.sha
-      sha256sum $dir/index.xml | cut -f 1 -d " " > $dir/index.xml.sha
+      if $java -jar $repoindex $dir -d $dir -r $dir/index.xml.gz; then
+        # Extract index.xml.gz to index.xml and calculate its sha on the way
+        # through, so index.xml does not have to be read back from disk
+        #gzcat $dir/index.xml.gz > $dir/index.xml
+        gunzip  -c $dir/index.xml.gz | tee $dir/index.xml | sha256sum | cut -f 1 -d " " > $dir/index.xml.sha
+        [[ "${PIPESTATUS[*]}" == "0 0 0 0" ]] || failed=1
+        # Calculate sha for index.xml.gz
+        sha256sum $dir/index.xml.gz | cut -f 1 -d " " > $dir/index.xml.gz.sha
+        [[ "${PIPESTATUS[*]}" == "0 0" ]] || failed=1
+      else
+        failed=1
+      fi
     fi
 
     if [[ -f $bindex ]]; then
-      echo "Running $bindex ..."
+      echo "Running $bindex for $dir ..."
+
+      ran=1
+      $java -jar $bindex -q -d $dir -r $dir/repository.xml -n "Amdatu ${dir}s" $files || failed=1
+    fi
 
-      $java -jar $bindex -q -d $dir -r $dir/repository.xml -n "Amdatu ${dir}s" $files
+    if [[ $ran == 1 && $failed == 0 ]]; then
+      mv $dir/$stampname.tmp $dir/$stampname
+    else
+      rm -f $dir/$stampname.tmp
     fi
+    return $failed
+}
+
+# Stops the indexing of all directories when the script is interrupted, and
+# removes their pending stamps so they are indexed again on the next run.
+# Exits with the given status, 128 + the number of the signal received.
+interrupted() {
+    trap - HUP INT TERM
+    for pid in ${pids[@]}; do
+        kill -- -$pid 2>/dev/null
+    done
+    wait
+    for dir in ${dirs[@]}; do
+        rm -f $dir/$stampname.tmp
+    done
+    exit $1
+}
+
+# Generate the actual index files... the directories share no files, so
+# they are indexed concurrently and waited for before exiting. Each one runs
+# as its own job (process group), which no longer sees hangups or Ctrl-C
+# itself, so these are passed on to its indexers by interrupted.
+pids=()
+set -m
+trap 'interrupted 129' HUP
+trap 'interrupted 130' INT
+trap 'interrupted 143' TERM
+for dir in ${dirs[@]}; do
+    index_dir $dir &
+    pids+=( $! )
+done
+set +m
+status=0
+for pid in ${pids[@]}; do
+    wait $pid || status=1
 done
+exit $status
 
 ###EOF
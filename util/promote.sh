@@ -38,8 +38,17 @@ if [[ -z $VERSION_DIR || ! -d "$STAGING_DIR/$VERSION_DIR" ]]; then
  exit 1
 fi
 
+# Prints the value of manifest header $1 found in the manifest text $2
+manifest_header() {
+  echo "$2" | sed -n -e "s/^$1:\s*\(.*\)$/\1/p"
+}
+
+# Staged source and binary releases, listed once for both guarding and copying
+scrs=( `ls $STAGING_DIR/$VERSION_DIR` )
+bnds=( `ls $STAGING_DIR/$VERSION_DIR/repository | grep .jar` )
+
 # Guarding against overwriting existing source releases
-for scr in `ls $STAGING_DIR/$VERSION_DIR`
+for scr in ${scrs[@]}
 do
   if [[ ! -d $STAGING_DIR/$VERSION_DIR/$scr ]]; then
     if [[ -e $SCRRELEASE_DIR/$scr ]]; then
@@ -49,19 +58,25 @@ do
   fi
 done
 
-# Guarding against overwriting existing binary releases
-for bnd in `ls $STAGING_DIR/$VERSION_DIR/repository | grep .jar`
+# Guarding against overwriting existing binary releases, each manifest is
+# read once and its bsn and version are kept for copying below
+bsns=()
+vers=()
+for bnd in ${bnds[@]}
 do
-  ver=`unzip -p $STAGING_DIR/$VERSION_DIR/repository/$bnd META-INF/MANIFEST.MF | tr -s '\r' '\n' | grep Bundle-Version | sed -e 's/^Bundle-Version:\s*\(.*\)$/\1/'`
-  bsn=`unzip -p $STAGING_DIR/$VERSION_DIR/repository/$bnd META-INF/MANIFEST.MF | tr -s '\r' '\n' | grep Bundle-SymbolicName | sed -e 's/^Bundle-SymbolicName:\s*\(.*\)$/\1/'`
+  mf=`unzip -p $STAGING_DIR/$VERSION_DIR/repository/$bnd META-INF/MANIFEST.MF | tr -s '\r' '\n'`
+  ver=`manifest_header Bundle-Version "$mf"`
+  bsn=`manifest_header Bundle-SymbolicName "$mf"`
   if [[ -e "$RELEASE_DIR/$bsn/$bsn-$ver.jar" ]]; then
     echo "Bundle file allready exists in release directory: $RELEASE_DIR/$bsn/$bsn-$ver.jar"
     exit 1;
   fi
+  bsns+=( "$bsn" )
+  vers+=( "$ver" )
 done
 
 # Copying source release
-for scr in `ls $STAGING_DIR/$VERSION_DIR`
+for scr in ${scrs[@]}
 do
   if [[ ! -d $STAGING_DIR/$VERSION_DIR/$scr ]]; then
     echo "Promoting source file to release dir: $scr"
@@ -70,10 +85,11 @@ do
 done
 
 # Copying binary release
-for bnd in `ls $STAGING_DIR/$VERSION_DIR/repository | grep .jar`
+for i in ${!bnds[@]}
 do
- ver=`unzip -p $STAGING_DIR/$VERSION_DIR/repository/$bnd META-INF/MANIFEST.MF | tr -s '\r' '\n' | grep Bundle-Version | sed -e 's/^Bundle-Version:\s*\(.*\)$/\1/'`
- bsn=`unzip -p $STAGING_DIR/$VERSION_DIR/repository/$bnd META-INF/MANIFEST.MF | tr -s '\r' '\n' | grep Bundle-SymbolicName | sed -e 's/^Bundle-SymbolicName:\s*\(.*\)$/\1/'`
+ bnd=${bnds[$i]}
+ bsn=${bsns[$i]}
+ ver=${vers[$i]}
  [ -d "$RELEASE_DIR/$bsn" ] || mkdir $RELEASE_DIR/$bsn
  echo "Promoting binary file to release dir: $bnd"
  cp -v $STAGING_DIR/$VERSION_DIR/repository/$bnd $RELEASE_DIR/$bsn/$bsn-$ver.jar 